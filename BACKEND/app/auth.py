@@ -9,11 +9,12 @@ from database import get_db
 from models.user import AdminUser
 from schemas import TokenData
 from core.config import settings
+from core.log_queue import SamplingFilter
 import logging
 
 # Set up dedicated auth logging
 auth_logger = logging.getLogger('auth_flow')
-auth_logger.setLevel(logging.DEBUG)
+auth_logger.addFilter(SamplingFilter())
 
 # Security configuration
 SECRET_KEY = settings.secret_key
@@ -50,7 +51,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
     except Exception as e:
-        auth_logger.error(f"❌ JWT CREATION FAILED - Error: {e}")
+        auth_logger.error("❌ JWT CREATION FAILED - Error: %s", e)
         raise
 
 def authenticate_user(db: Session, username: str, password: str):
@@ -87,20 +88,20 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         token_data = TokenData(username=username)
 
     except jwt.ExpiredSignatureError as e:
-        auth_logger.error(f"❌ TOKEN EXPIRED - {e}")
+        auth_logger.error("❌ TOKEN EXPIRED - %s", e)
         # Note: payload is not available here since decode failed, so we can't show expiration details
-        auth_logger.error(f"❌ TOKEN EXPIRED - Please refresh your session")
+        auth_logger.error("❌ TOKEN EXPIRED - Please refresh your session")
         raise credentials_exception
     except jwt.InvalidTokenError as e:
-        auth_logger.error(f"❌ INVALID TOKEN - {e}")
+        auth_logger.error("❌ INVALID TOKEN - %s", e)
         raise credentials_exception
     except JWTError as e:
-        auth_logger.error(f"❌ JWT DECODE ERROR - {e}")
-        auth_logger.error(f"❌ ERROR TYPE - {type(e).__name__}")
+        auth_logger.error("❌ JWT DECODE ERROR - %s", e)
+        auth_logger.error("❌ ERROR TYPE - %s", type(e).__name__)
         raise credentials_exception
     except Exception as e:
-        auth_logger.error(f"💥 UNEXPECTED ERROR IN TOKEN DECODE - {e}")
-        auth_logger.error(f"💥 ERROR TYPE - {type(e).__name__}")
+        auth_logger.error("💥 UNEXPECTED ERROR IN TOKEN DECODE - %s", e)
+        auth_logger.error("💥 ERROR TYPE - %s", type(e).__name__)
         raise credentials_exception
 
     try:
@@ -131,17 +132,6 @@ def get_current_superuser(current_user: AdminUser = Depends(get_current_active_u
 # HTTPS Enforcement (Uncomment in production)
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 
-# Rate Limiting (Uncomment in production)
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
-
 # CORS Settings (Uncomment and configure for production)
 from fastapi.middleware.cors import CORSMiddleware
 
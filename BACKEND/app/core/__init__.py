@@ -1,3 +1,6 @@
 from .config import settings, Settings
+from .cache import cache, TTLCache
+from .log_queue import start_queue_logging, stop_queue_logging
+from .rate_limit import limiter
 
-__all__ = ["settings", "Settings"]
+__all__ = ["settings", "Settings", "cache", "TTLCache", "start_queue_logging", "stop_queue_logging", "limiter"]
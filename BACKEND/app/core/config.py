@@ -4,6 +4,11 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./nekwasa.db"
+    # Connection pool per worker process (4 gunicorn workers share the Postgres connection limit)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 3600
+    db_pool_timeout: int = 5  # Seconds to wait for a free connection before failing the request
 
     # Security
     secret_key: str = "your-secret-key-change-in-production"
@@ -23,6 +28,28 @@ class Settings(BaseSettings):
         "https://store.nekwasar.com"
     ]
 
+    # Rate limiting for the unauthenticated login and tracking endpoints
+    login_rate_limit: str = "10/minute"
+    register_rate_limit: str = "5/minute"
+    track_rate_limit: str = "100/second"
+    # memory:// keeps separate counters in each gunicorn worker, so with 4 workers a client can get up to
+    # 4x the configured rate; point it at Redis (redis://...) to share one set of counters
+    rate_limit_storage_uri: str = "memory://"
+    # Client address header set by nginx (nginx.conf proxies from loopback). It is only trusted on requests
+    # whose peer is one of rate_limit_trusted_proxies; anything else is keyed on the peer address.
+    # Set it empty if the app is not behind a proxy
+    rate_limit_ip_header: str = "X-Real-IP"
+    rate_limit_trusted_proxies: list = ["127.0.0.1", "::1"]
+
+    # Seconds between writes of buffered blog post view counts
+    view_count_flush_interval: int = 60
+
+    # Logging
+    log_level: str = "INFO"
+
+    # Templates: re-check template files for edits on every render (development only)
+    jinja_auto_reload: bool = False
+
     # File Upload
     max_upload_size: int = 10 * 1024 * 1024  # 10MB
     upload_directory: str = "uploads"
@@ -42,6 +69,10 @@ class Settings(BaseSettings):
 
     # Analytics
     google_analytics_property_id: Optional[str] = None
+    # Tracking events are queued per worker and written in batches
+    analytics_queue_size: int = 10000
+    analytics_batch_size: int = 500
+    analytics_flush_interval: float = 2.0  # Seconds to wait for a batch to fill before writing it
 
     # Payment
     stripe_secret_key: Optional[str] = None
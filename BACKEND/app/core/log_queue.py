@@ -0,0 +1,85 @@
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+class SamplingFilter(logging.Filter):
+    """Caps how often one message template is logged per time window.
+
+    Within each window the first ``first`` records sharing a message template
+    pass, then only every ``thereafter``-th one. Records are grouped by the
+    unformatted ``record.msg``, so it only works for %-style calls that keep
+    variable data in the arguments. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, first: int = 10, thereafter: int = 100, window: float = 60.0):
+        super().__init__()
+        self.first = first
+        self.thereafter = thereafter
+        self.window = window
+        self._counts = {}
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.levelno, record.msg)
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                self._counts.clear()
+                self._window_start = now
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        if count <= self.first:
+            return True
+        return (count - self.first) % self.thereafter == 0
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+_listener: Optional[QueueListener] = None
+
+
+def start_queue_logging(max_records: int = 10000) -> None:
+    """Move the root logger's handlers onto a background thread.
+
+    Request code only enqueues records; the listener thread does the formatting
+    and stream writes. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    if not handlers:
+        return
+
+    log_queue = queue.Queue(max_records)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,19 @@
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from core.config import settings
+
+
+def client_ip(request: Request) -> str:
+    """Rate limit key: the peer address, or the proxy's client address header when the peer is a trusted proxy"""
+    peer = get_remote_address(request)
+    if settings.rate_limit_ip_header and peer in settings.rate_limit_trusted_proxies:
+        forwarded = request.headers.get(settings.rate_limit_ip_header)
+        if forwarded:
+            return forwarded
+    return peer
+
+
+# Shared limiter for route decorators; main.py registers it on the app
+limiter = Limiter(key_func=client_ip, storage_uri=settings.rate_limit_storage_uri)
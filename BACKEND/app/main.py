@@ -3,7 +3,7 @@ from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, Response
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, Response, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -18,20 +18,36 @@ from routes import (
     admin_router, search_router, newsletter_router, analytics_router, content_router
 )
 from core.config import settings
+from core.log_queue import start_queue_logging, stop_queue_logging
+from core.rate_limit import limiter
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from scheduler import init_scheduler, start_scheduler, stop_scheduler
+from services.analytics_buffer import start_analytics_buffer, stop_analytics_buffer
+from services.view_counts import flush_view_counts
 from models.user import AdminUser
 
-# Configure logging
-logging.basicConfig(level=logging.WARNING)
+# Configure logging for the whole app; route modules only create their loggers
+logging.basicConfig(
+    level=settings.log_level,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
 logger = logging.getLogger(__name__)
+# Log writes happen on a background thread instead of inside request handlers
+start_queue_logging()
 
 # Create FastAPI app
 app = FastAPI(
     title="NekwasaR Portfolio API",
     description="Backend API for NekwasaR's portfolio website",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Per-client rate limits on the unauthenticated login and tracking endpoints
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
 # Templates for admin pages
 templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
 
@@ -41,7 +57,7 @@ BLOG_DIR = PROJECT_ROOT / "blog"
 blog_templates = Jinja2Templates(directory=str(BLOG_DIR / "templates"))
 
 # Add strftime filter to blog templates
-from jinja2 import Environment, PackageLoader, select_autoescape
+from jinja2 import Environment, PackageLoader, select_autoescape, FileSystemBytecodeCache
 from datetime import datetime
 
 def strftime_filter(value, format):
@@ -62,6 +78,13 @@ def strftime_filter(value, format):
 
 blog_templates.env.filters['strftime'] = strftime_filter
 
+# Share compiled blog template bytecode across workers and restarts
+blog_templates.env.bytecode_cache = FileSystemBytecodeCache()
+
+# Templates only change on deploy, so skip the per-render mtime check unless configured
+templates.env.auto_reload = settings.jinja_auto_reload
+blog_templates.env.auto_reload = settings.jinja_auto_reload
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -71,6 +94,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Legacy admin API prefixes, rewritten onto the canonical /admin/api paths
+ADMIN_API_ALIASES = (
+    ("/api/admin/dashboard/", "/admin/api/dashboard/"),
+    ("/api/dashboard/", "/admin/api/dashboard/"),
+    ("/api/admin/blog/", "/admin/api/blog/"),
+)
+
+class AdminAPIAliasMiddleware:
+    """Map legacy admin API paths to their canonical route before routing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            path = scope["path"]
+            for alias, canonical in ADMIN_API_ALIASES:
+                if path.startswith(alias):
+                    scope = dict(scope, path=canonical + path[len(alias):])
+                    break
+        await self.app(scope, receive, send)
+
+app.add_middleware(AdminAPIAliasMiddleware)
+
 # Include routers
 app.include_router(contacts_router, prefix="/api/contacts", tags=["contacts"])
 app.include_router(blogs_router, prefix="/api/blogs", tags=["blogs"])
@@ -170,12 +217,21 @@ async def startup_event():
         logger.info("✅ Scheduler initialized")
         start_scheduler()
         logger.info("✅ Scheduler started")
+        start_analytics_buffer()
+        logger.info("✅ Analytics buffer started")
         logger.info("✅ Application started successfully!")
     except Exception as e:
         logger.error(f"❌ Startup failed: {str(e)}")
         logger.error(f"❌ Startup traceback: {traceback.format_exc()}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write buffered analytics and view counts, then flush log records still waiting in the queue"""
+    await stop_analytics_buffer()
+    flush_view_counts()
+    stop_queue_logging()
+
 # Default post data for SEO and sharing on non-article pages
 DEFAULT_POST_DATA = {
     'title': 'NekwasaR Blog - Professional Insights & Innovation',
@@ -479,12 +535,6 @@ async def blog_template3(request: Request):
 async def populer_redirect():
     return RedirectResponse(url="/popular", status_code=301)
 
-# Fallback admin dashboard routes (ensure rendering even if router load order conflicts)
-@app.get("/admin/dashboard", response_class=HTMLResponse)
-@app.get("/admin/dashboard/", response_class=HTMLResponse)
-async def admin_dashboard_page(request: Request):
-    return templates.TemplateResponse("admin_dashboard.html", {"request": request})
-
 
 # Production Security Features (Commented for easy enabling)
 """
@@ -493,17 +543,6 @@ from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 
 app.add_middleware(HTTPSRedirectMiddleware)
 
-# Rate Limiting (Uncomment in production)
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
-
 # Enhanced CORS (Uncomment and configure for production)
 app.add_middleware(
     CORSMiddleware,
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, func, Enum, BigInteger, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, func, Enum, BigInteger, Float, UniqueConstraint, Index, Table, event, inspect, select, update, literal, cast
 from database import Base
 
 class BlogPost(Base):
@@ -27,6 +27,15 @@ class BlogPost(Base):
     comment_count = Column(Integer, default=0)
     share_count = Column(Integer, default=0)  # New: share tracking
 
+    __table_args__ = (
+        # Serves "most viewed" listings (ORDER BY view_count DESC LIMIT n) from the index
+        Index('ix_blog_posts_view_count_published_at', view_count.desc(), published_at.desc()),
+        # Newest-first listings and the published/draft split
+        Index('ix_blog_posts_published_at', published_at),
+        # Per-section counts in the admin listing
+        Index('ix_blog_posts_section', section),
+    )
+
 class BlogComment(Base):
     __tablename__ = "blog_comments"
 
@@ -112,6 +121,88 @@ class BlogTag(Base):
     display_order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# Post <-> tag junction, materialized from the slugs stored in BlogPost.tags
+post_tags = Table(
+    "post_tags",
+    Base.metadata,
+    Column("post_id", Integer, ForeignKey("blog_posts.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("blog_tags.id", ondelete="CASCADE"), primary_key=True, index=True)
+)
+
+def tagged_with(slugs):
+    """Filter clause matching posts linked to any of the given tag slugs through post_tags"""
+    return BlogPost.id.in_(
+        select(post_tags.c.post_id)
+        .join(BlogTag, BlogTag.id == post_tags.c.tag_id)
+        .where(BlogTag.slug.in_(slugs))
+    )
+
+def refresh_tag_counts(connection, tag_ids=None):
+    """Recompute BlogTag.post_count from post_tags for the given tag ids (every tag when None)"""
+    if tag_ids is not None and not tag_ids:
+        return
+    linked_posts = select(func.count()).select_from(post_tags).where(
+        post_tags.c.tag_id == BlogTag.id
+    ).scalar_subquery()
+    stmt = update(BlogTag).values(post_count=linked_posts)
+    if tag_ids is not None:
+        stmt = stmt.where(BlogTag.id.in_(set(tag_ids)))
+    connection.execute(stmt)
+
+def unlink_posts(connection, post_ids):
+    """Drop the junction rows of posts being deleted and update the affected tag counts"""
+    unlinked = connection.execute(
+        post_tags.delete().where(post_tags.c.post_id.in_(post_ids)).returning(post_tags.c.tag_id)
+    ).scalars().all()
+    refresh_tag_counts(connection, unlinked)
+
+def relink_post_tags(connection, post_id, tags):
+    """Rewrite a post's junction rows from its tags value and update the affected tag counts"""
+    affected = connection.execute(
+        post_tags.delete().where(post_tags.c.post_id == post_id).returning(post_tags.c.tag_id)
+    ).scalars().all()
+    slugs = [tag for tag in (tags or []) if isinstance(tag, str)]
+    if slugs:
+        affected += connection.execute(post_tags.insert().from_select(
+            ["post_id", "tag_id"],
+            select(literal(post_id), BlogTag.id).where(BlogTag.slug.in_(slugs))
+        ).returning(post_tags.c.tag_id)).scalars().all()
+    refresh_tag_counts(connection, affected)
+
+@event.listens_for(BlogPost, "after_insert")
+@event.listens_for(BlogPost, "after_update")
+def sync_post_tags(mapper, connection, target):
+    """Rewrite a post's junction rows whenever its tags column changes"""
+    if not inspect(target).attrs.tags.history.has_changes():
+        return
+    relink_post_tags(connection, target.id, target.tags)
+
+def link_tags_by_slug(connection, slugs):
+    """Attach the given (new) tags to posts that already reference their slugs"""
+    linked = connection.execute(post_tags.insert().from_select(
+        ["post_id", "tag_id"],
+        select(BlogPost.id, BlogTag.id)
+        .join(BlogTag, cast(BlogPost.tags, String).like('%"' + BlogTag.slug + '"%'))
+        .where(BlogTag.slug.in_(slugs))
+    ).returning(post_tags.c.tag_id)).scalars().all()
+    refresh_tag_counts(connection, linked)
+    return len(linked)
+
+@event.listens_for(BlogTag, "after_insert")
+def link_new_tag(mapper, connection, target):
+    """Attach a newly created tag to posts that already reference its slug"""
+    link_tags_by_slug(connection, [target.slug])
+
+@event.listens_for(BlogPost, "before_delete")
+def unlink_deleted_post(mapper, connection, target):
+    """Drop junction rows ahead of the post (SQLite does not enforce the cascade)"""
+    unlink_posts(connection, [target.id])
+
+@event.listens_for(BlogTag, "before_delete")
+def unlink_deleted_tag(mapper, connection, target):
+    """Drop junction rows ahead of the tag (SQLite does not enforce the cascade)"""
+    connection.execute(post_tags.delete().where(post_tags.c.tag_id == target.id))
+
 class NewsletterSubscriber(Base):
     __tablename__ = "newsletter_subscribers"
 
@@ -136,6 +227,11 @@ class SearchAnalytics(Base):
     user_agent = Column(String(500))  # Browser info
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Popular searches over a time range
+        Index('ix_search_analytics_timestamp_query', timestamp, query),
+    )
+
 class NewsletterCampaign(Base):
     __tablename__ = "newsletter_campaigns"
 
@@ -299,6 +395,8 @@ class BulkOperation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 # Analytics Models
+# Raw page view events; breakdowns read the hourly rollups (PageViewHourly, PageViewDimensionHourly),
+# so this insert-heavy table carries no (timestamp, dimension) indexes
 class PageViewAnalytics(Base):
     __tablename__ = "page_view_analytics"
 
@@ -482,6 +580,22 @@ class RealTimeMetrics(Base):
     time_window = Column(String(20))  # 1m, 5m, 1h, 24h
     data_type = Column(String(20))    # count, rate, percentage
 
+# Hourly page view rollups, written in the same transaction as the raw events
+class PageViewHourly(Base):
+    __tablename__ = "page_view_hourly"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Start of the hour
+    post_id = Column(Integer, primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+
+class PageViewDimensionHourly(Base):
+    __tablename__ = "page_view_dimension_hourly"
+
+    dimension = Column(String(50), primary_key=True)  # device_type, country, referrer_domain
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    value = Column(String(255), primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+
 class AnalyticsReports(Base):
     __tablename__ = "analytics_reports"
 
@@ -1,65 +1,101 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import NamedTuple, Optional, List
 from datetime import datetime, timedelta
+import orjson
 
+from core.cache import cache
+from core.config import settings
+from core.rate_limit import limiter
 from database import get_db
-from services.analytics_service import AnalyticsService
+from models.blog import AnalyticsReports
+from services.analytics_service import AnalyticsService, LIVE_CACHE_PREFIX
+from services.analytics_buffer import enqueue_event
 from schemas.blog import (
     PageViewAnalyticsCreate, ContentEngagementAnalyticsCreate,
     UserSessionAnalyticsCreate, ReferralAnalyticsCreate,
-    AnalyticsDashboardResponse, AnalyticsReportRequest
+    AnalyticsDashboardResponse, AnalyticsReportRequest, AnalyticsTrackBatch
 )
 
 router = APIRouter()
 
+# Upper bound on events in one /track/batch request
+MAX_TRACK_BATCH_EVENTS = 200
+# Upper bounds on the public list sizes and lookback windows; both are part of cache keys
+MAX_RESULTS_LIMIT = 100
+MAX_TIMEFRAME_DAYS = 365
+
+# Aggregates change slowly, so each worker reuses the serialized response for a while.
+# Keys under LIVE_CACHE_PREFIX are also dropped whenever the analytics buffer writes a batch.
+REALTIME_CACHE_TTL = 10
+DASHBOARD_CACHE_TTL = 60
+CONTENT_CACHE_TTL = 120
+BREAKDOWN_CACHE_TTL = 300
+
+class DateRange(NamedTuple):
+    start: datetime
+    end: datetime
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.start.isoformat()}:{self.end.isoformat()}"
+
+def date_range(start_date: Optional[str] = None, end_date: Optional[str] = None) -> DateRange:
+    """Parse the optional ISO start/end query parameters, defaulting to the last 30 days"""
+    now = datetime.now()
+    try:
+        start = datetime.fromisoformat(start_date) if start_date else now - timedelta(days=30)
+        end = datetime.fromisoformat(end_date) if end_date else now
+    except ValueError:
+        raise HTTPException(422, "start_date and end_date must be ISO 8601 dates")
+    # Widen to whole hours, the rollup granularity, so arbitrary timestamps share one cache key per hour
+    start = start.replace(minute=0, second=0, microsecond=0)
+    end_hour = end.replace(minute=0, second=0, microsecond=0)
+    return DateRange(start, end_hour if end_hour == end else end_hour + timedelta(hours=1))
+
+def _cached_response(key: str) -> Optional[Response]:
+    """Return the stored JSON body for key, if any"""
+    body = cache.get(key)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+def _store_response(key: str, payload, ttl: int) -> Response:
+    """Serialize payload once and keep the bytes for ttl seconds"""
+    body = orjson.dumps(payload)
+    cache.set(key, body, ttl=ttl)
+    return Response(content=body, media_type="application/json")
+
+# The track endpoints only touch the event-loop-owned queue, so they stay async;
+# handlers that query the database are plain functions and run in the threadpool
 @router.post("/track/pageview")
+@limiter.limit(settings.track_rate_limit)
 async def track_page_view(
     analytics_data: PageViewAnalyticsCreate,
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
     """Track page view analytics"""
-    try:
-        analytics_service = AnalyticsService(db)
+    # Add request-specific data; the row is written by the analytics buffer
+    analytics_data.ip_address = request.client.host if request.client else None
+    enqueue_event("pageview", analytics_data)
 
-        # Add request-specific data
-        analytics_data.ip_address = request.client.host if request.client else None
-
-        page_view = analytics_service.track_page_view(analytics_data)
-
-        return {
-            "success": True,
-            "tracked": True,
-            "id": page_view.id
-        }
-
-    except Exception as e:
-        raise HTTPException(500, f"Failed to track page view: {str(e)}")
+    return {"success": True, "queued": True}
 
 @router.post("/track/engagement")
-async def track_engagement(
-    engagement_data: ContentEngagementAnalyticsCreate,
-    request: Request,
-    db: Session = Depends(get_db)
-):
+@limiter.limit(settings.track_rate_limit)
+async def track_engagement(engagement_data: ContentEngagementAnalyticsCreate, request: Request):
     """Track user engagement events"""
-    try:
-        analytics_service = AnalyticsService(db)
-        engagement = analytics_service.track_engagement(engagement_data)
-
-        return {
-            "success": True,
-            "tracked": True,
-            "id": engagement.id
-        }
+    enqueue_event("engagement", engagement_data)
 
-    except Exception as e:
-        raise HTTPException(500, f"Failed to track engagement: {str(e)}")
+    return {"success": True, "queued": True}
 
 @router.post("/track/session")
-async def track_session(
+@limiter.limit(settings.track_rate_limit)
+def track_session(
     session_data: UserSessionAnalyticsCreate,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Track or update user session"""
@@ -77,57 +113,94 @@ async def track_session(
         raise HTTPException(500, f"Failed to track session: {str(e)}")
 
 @router.post("/track/referral")
-async def track_referral(
-    referral_data: ReferralAnalyticsCreate,
-    db: Session = Depends(get_db)
-):
+@limiter.limit(settings.track_rate_limit)
+async def track_referral(referral_data: ReferralAnalyticsCreate, request: Request):
     """Track referral and UTM data"""
-    try:
-        analytics_service = AnalyticsService(db)
-        referral = analytics_service.track_referral(referral_data)
+    enqueue_event("referral", referral_data)
 
-        return {
-            "success": True,
-            "tracked": True,
-            "id": referral.id
-        }
+    return {"success": True, "queued": True}
 
-    except Exception as e:
-        raise HTTPException(500, f"Failed to track referral: {str(e)}")
+@router.post("/track/batch")
+@limiter.limit(settings.track_rate_limit)
+async def track_batch(
+    batch: AnalyticsTrackBatch,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Track several events from one page load in a single request"""
+    total = len(batch.pageviews) + len(batch.engagements) + len(batch.sessions) + len(batch.referrals)
+    if total > MAX_TRACK_BATCH_EVENTS:
+        raise HTTPException(422, f"A batch can hold at most {MAX_TRACK_BATCH_EVENTS} events")
+
+    ip_address = request.client.host if request.client else None
+    for analytics_data in batch.pageviews:
+        analytics_data.ip_address = ip_address
+        enqueue_event("pageview", analytics_data)
+    for engagement_data in batch.engagements:
+        enqueue_event("engagement", engagement_data)
+    for referral_data in batch.referrals:
+        enqueue_event("referral", referral_data)
+
+    # Sessions are upserts, so they are written now, in one transaction
+    if batch.sessions:
+        try:
+            await run_in_threadpool(AnalyticsService(db).track_sessions, batch.sessions)
+        except Exception as e:
+            raise HTTPException(500, f"Failed to track sessions: {str(e)}")
+
+    return {
+        "success": True,
+        "counts": {
+            "pageviews": len(batch.pageviews),
+            "engagements": len(batch.engagements),
+            "sessions": len(batch.sessions),
+            "referrals": len(batch.referrals)
+        }
+    }
 
 @router.get("/dashboard", response_model=AnalyticsDashboardResponse)
-async def get_dashboard(
-    timeframe_days: int = Query(30, description="Number of days to look back"),
+def get_dashboard(
+    timeframe_days: int = Query(30, ge=1, le=MAX_TIMEFRAME_DAYS, description="Number of days to look back"),
     db: Session = Depends(get_db)
 ):
     """Get analytics dashboard data"""
     try:
+        cache_key = f"{LIVE_CACHE_PREFIX}dashboard:{timeframe_days}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         analytics_service = AnalyticsService(db)
         dashboard_data = analytics_service.get_dashboard_data(timeframe_days)
 
-        return dashboard_data
+        return _store_response(cache_key, dashboard_data.dict(), DASHBOARD_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get dashboard data: {str(e)}")
 
 @router.get("/realtime")
-async def get_realtime_metrics(db: Session = Depends(get_db)):
+def get_realtime_metrics(db: Session = Depends(get_db)):
     """Get real-time analytics metrics (last 5 minutes)"""
     try:
+        cache_key = f"{LIVE_CACHE_PREFIX}realtime"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         analytics_service = AnalyticsService(db)
         realtime_data = analytics_service._get_realtime_metrics()
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
             "data": realtime_data,
             "timestamp": datetime.now().isoformat()
-        }
+        }, REALTIME_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get real-time metrics: {str(e)}")
 
 @router.post("/reports/generate")
-async def generate_report(
+def generate_report(
     report_request: AnalyticsReportRequest,
     db: Session = Depends(get_db)
 ):
@@ -148,16 +221,25 @@ async def generate_report(
         raise HTTPException(500, f"Failed to generate report: {str(e)}")
 
 @router.get("/reports")
-async def get_reports(
+def get_reports(
     report_type: Optional[str] = None,
     limit: int = Query(20, description="Number of reports to return"),
     db: Session = Depends(get_db)
 ):
     """Get list of generated reports"""
     try:
-        from models.blog import AnalyticsReports
-
-        query = db.query(AnalyticsReports)
+        # Only the listed columns; the JSON report payloads stay in the database
+        query = db.query(
+            AnalyticsReports.id,
+            AnalyticsReports.report_type,
+            AnalyticsReports.report_name,
+            AnalyticsReports.generated_at,
+            AnalyticsReports.date_range_start,
+            AnalyticsReports.date_range_end,
+            AnalyticsReports.total_views,
+            AnalyticsReports.total_sessions,
+            AnalyticsReports.total_users
+        )
         if report_type:
             query = query.filter(AnalyticsReports.report_type == report_type)
 
@@ -165,17 +247,18 @@ async def get_reports(
             AnalyticsReports.generated_at.desc()
         ).limit(limit).all()
 
-        return {
+        # Returned directly so orjson encodes the datetimes itself
+        return ORJSONResponse({
             "success": True,
             "reports": [
                 {
                     "id": report.id,
                     "report_type": report.report_type,
                     "report_name": report.report_name,
-                    "generated_at": report.generated_at.isoformat(),
+                    "generated_at": report.generated_at,
                     "date_range": {
-                        "start": report.date_range_start.isoformat(),
-                        "end": report.date_range_end.isoformat()
+                        "start": report.date_range_start,
+                        "end": report.date_range_end
                     },
                     "total_views": report.total_views,
                     "total_sessions": report.total_sessions,
@@ -183,20 +266,18 @@ async def get_reports(
                 }
                 for report in reports
             ]
-        }
+        })
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get reports: {str(e)}")
 
 @router.get("/reports/{report_id}")
-async def get_report(
+def get_report(
     report_id: int,
     db: Session = Depends(get_db)
 ):
     """Get detailed report data"""
     try:
-        from models.blog import AnalyticsReports
-
         report = db.query(AnalyticsReports).filter(
             AnalyticsReports.id == report_id
         ).first()
@@ -204,16 +285,16 @@ async def get_report(
         if not report:
             raise HTTPException(404, "Report not found")
 
-        return {
+        return ORJSONResponse({
             "success": True,
             "report": {
                 "id": report.id,
                 "report_type": report.report_type,
                 "report_name": report.report_name,
-                "generated_at": report.generated_at.isoformat(),
+                "generated_at": report.generated_at,
                 "date_range": {
-                    "start": report.date_range_start.isoformat(),
-                    "end": report.date_range_end.isoformat()
+                    "start": report.date_range_start,
+                    "end": report.date_range_end
                 },
                 "metrics": {
                     "total_views": report.total_views,
@@ -224,7 +305,7 @@ async def get_report(
                 "top_content": report.top_content,
                 "key_insights": report.key_insights
             }
-        }
+        })
 
     except HTTPException:
         raise
@@ -232,207 +313,168 @@ async def get_report(
         raise HTTPException(500, f"Failed to get report: {str(e)}")
 
 @router.get("/content-performance")
-async def get_content_performance(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    limit: int = Query(50, description="Number of posts to return"),
+def get_content_performance(
+    dates: DateRange = Depends(date_range),
+    limit: int = Query(50, ge=1, le=MAX_RESULTS_LIMIT, description="Number of posts to return"),
     db: Session = Depends(get_db)
 ):
     """Get content performance analytics"""
     try:
-        analytics_service = AnalyticsService(db)
+        cache_key = f"analytics:content-performance:{dates.cache_key}:{limit}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
 
-        # Parse dates
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            start = datetime.now() - timedelta(days=30)
-
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-        else:
-            end = datetime.now()
+        analytics_service = AnalyticsService(db)
 
-        top_content = analytics_service._get_top_content(start, limit)
+        top_content = analytics_service._get_top_content(dates.start, limit)
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
             "date_range": {
-                "start": start.isoformat(),
-                "end": end.isoformat()
+                "start": dates.start.isoformat(),
+                "end": dates.end.isoformat()
             },
             "content_performance": top_content
-        }
+        }, CONTENT_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get content performance: {str(e)}")
 
 @router.get("/search-analytics")
-async def get_search_analytics(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    limit: int = Query(50, description="Number of queries to return"),
+def get_search_analytics(
+    dates: DateRange = Depends(date_range),
+    limit: int = Query(50, ge=1, le=MAX_RESULTS_LIMIT, description="Number of queries to return"),
     db: Session = Depends(get_db)
 ):
     """Get search analytics data"""
     try:
-        analytics_service = AnalyticsService(db)
+        cache_key = f"analytics:search:{dates.cache_key}:{limit}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
 
-        # Parse dates
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            start = datetime.now() - timedelta(days=30)
-
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-        else:
-            end = datetime.now()
+        analytics_service = AnalyticsService(db)
 
-        popular_searches = analytics_service._get_popular_searches(start, limit)
+        popular_searches = analytics_service._get_popular_searches(dates.start, limit)
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
             "date_range": {
-                "start": start.isoformat(),
-                "end": end.isoformat()
+                "start": dates.start.isoformat(),
+                "end": dates.end.isoformat()
             },
             "popular_searches": popular_searches
-        }
+        }, CONTENT_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get search analytics: {str(e)}")
 
 @router.get("/geographic-analytics")
-async def get_geographic_analytics(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    limit: int = Query(20, description="Number of countries to return"),
+def get_geographic_analytics(
+    dates: DateRange = Depends(date_range),
+    limit: int = Query(20, ge=1, le=MAX_RESULTS_LIMIT, description="Number of countries to return"),
     db: Session = Depends(get_db)
 ):
     """Get geographic analytics data"""
     try:
-        analytics_service = AnalyticsService(db)
-
-        # Parse dates
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            start = datetime.now() - timedelta(days=30)
+        cache_key = f"analytics:geographic:{dates.cache_key}:{limit}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
 
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-        else:
-            end = datetime.now()
+        analytics_service = AnalyticsService(db)
 
-        geographic_data = analytics_service._get_geographic_data(start, limit)
+        geographic_data = analytics_service._get_geographic_data(dates.start, limit)
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
             "date_range": {
-                "start": start.isoformat(),
-                "end": end.isoformat()
+                "start": dates.start.isoformat(),
+                "end": dates.end.isoformat()
             },
             "geographic_data": geographic_data
-        }
+        }, BREAKDOWN_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get geographic analytics: {str(e)}")
 
 @router.get("/device-analytics")
-async def get_device_analytics(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
+def get_device_analytics(
+    dates: DateRange = Depends(date_range),
     db: Session = Depends(get_db)
 ):
     """Get device and browser analytics"""
     try:
-        analytics_service = AnalyticsService(db)
-
-        # Parse dates
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            start = datetime.now() - timedelta(days=30)
+        cache_key = f"analytics:device:{dates.cache_key}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
 
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-        else:
-            end = datetime.now()
+        analytics_service = AnalyticsService(db)
 
-        device_breakdown = analytics_service._get_device_breakdown(start)
+        device_breakdown = analytics_service._get_device_breakdown(dates.start)
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
             "date_range": {
-                "start": start.isoformat(),
-                "end": end.isoformat()
+                "start": dates.start.isoformat(),
+                "end": dates.end.isoformat()
             },
             "device_breakdown": device_breakdown
-        }
+        }, BREAKDOWN_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get device analytics: {str(e)}")
 
 @router.get("/referral-analytics")
-async def get_referral_analytics(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    limit: int = Query(20, description="Number of referrers to return"),
+def get_referral_analytics(
+    dates: DateRange = Depends(date_range),
+    limit: int = Query(20, ge=1, le=MAX_RESULTS_LIMIT, description="Number of referrers to return"),
     db: Session = Depends(get_db)
 ):
     """Get referral source analytics"""
     try:
-        analytics_service = AnalyticsService(db)
+        cache_key = f"analytics:referral:{dates.cache_key}:{limit}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
 
-        # Parse dates
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            start = datetime.now() - timedelta(days=30)
-
-        if end_date:
-            end = datetime.fromisoformat(end_date)
-        else:
-            end = datetime.now()
+        analytics_service = AnalyticsService(db)
 
-        referral_sources = analytics_service._get_referral_sources(start, limit)
+        referral_sources = analytics_service._get_referral_sources(dates.start, limit)
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
             "date_range": {
-                "start": start.isoformat(),
-                "end": end.isoformat()
+                "start": dates.start.isoformat(),
+                "end": dates.end.isoformat()
             },
             "referral_sources": referral_sources
-        }
+        }, BREAKDOWN_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get referral analytics: {str(e)}")
 
 @router.get("/summary")
-async def get_analytics_summary(
-    timeframe_days: int = Query(7, description="Number of days for summary"),
+def get_analytics_summary(
+    timeframe_days: int = Query(7, ge=1, le=MAX_TIMEFRAME_DAYS, description="Number of days for summary"),
     db: Session = Depends(get_db)
 ):
     """Get quick analytics summary"""
     try:
+        cache_key = f"{LIVE_CACHE_PREFIX}summary:{timeframe_days}"
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         analytics_service = AnalyticsService(db)
-        dashboard_data = analytics_service.get_dashboard_data(timeframe_days)
+        summary = analytics_service.get_summary_data(timeframe_days)
 
-        return {
+        return _store_response(cache_key, {
             "success": True,
-            "summary": {
-                "total_views": dashboard_data.total_views,
-                "total_sessions": dashboard_data.total_sessions,
-                "total_users": dashboard_data.total_users,
-                "active_users": dashboard_data.active_users,
-                "page_views_today": dashboard_data.page_views_today,
-                "page_views_yesterday": dashboard_data.page_views_yesterday,
-                "top_content_count": len(dashboard_data.top_content),
-                "timeframe_days": timeframe_days
-            }
-        }
+            "summary": {**summary, "timeframe_days": timeframe_days}
+        }, DASHBOARD_CACHE_TTL)
 
     except Exception as e:
         raise HTTPException(500, f"Failed to get analytics summary: {str(e)}")
\ No newline at end of file
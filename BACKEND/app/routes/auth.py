@@ -1,8 +1,12 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from database import get_db
+from core.config import settings
+from core.rate_limit import limiter
 from auth import authenticate_user, create_access_token, get_current_active_user, get_current_superuser
 from models.user import AdminUser as DBAdminUser
 from schemas import AdminUserCreate, AdminUser as AdminUserSchema, Token, AdminLogin
@@ -10,20 +14,13 @@ import logging
 
 # Set up dedicated auth route logging
 auth_route_logger = logging.getLogger('auth_routes')
-auth_route_logger.setLevel(logging.DEBUG)
 
 router = APIRouter()
 
 @router.post("/register", response_model=AdminUserSchema)
-async def register_admin(user: AdminUserCreate, db: Session = Depends(get_db)):
+@limiter.limit(settings.register_rate_limit)
+def register_admin(request: Request, user: AdminUserCreate, db: Session = Depends(get_db)):
     """Register a new admin user (only for initial setup)"""
-    # Check if user already exists
-    db_user = db.query(DBAdminUser).filter(
-        (DBAdminUser.username == user.username) | (DBAdminUser.email == user.email)
-    ).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username or email already registered")
-
     # Create new admin user
     from auth import get_password_hash
     hashed_password = get_password_hash(user.password)
@@ -34,7 +31,12 @@ async def register_admin(user: AdminUserCreate, db: Session = Depends(get_db)):
         is_superuser=True  # First user is superuser
     )
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # username and email are UNIQUE, so the insert itself rejects an existing user
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already registered")
     db.refresh(db_user)
     return AdminUserSchema(
         id=db_user.id,
@@ -47,7 +49,8 @@ async def register_admin(user: AdminUserCreate, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@limiter.limit(settings.login_rate_limit)
+def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login and get access token"""
     user = authenticate_user(db, form_data.username, form_data.password)
 
@@ -71,33 +74,47 @@ async def read_users_me(current_user: DBAdminUser = Depends(get_current_active_u
     return current_user
 
 @router.get("/users", response_model=list[AdminUserSchema])
-async def get_admin_users(
+def get_admin_users(
     skip: int = 0,
     limit: int = 100,
     current_user: DBAdminUser = Depends(get_current_superuser),
     db: Session = Depends(get_db)
 ):
     """Get all admin users (superuser only)"""
-    users = db.query(DBAdminUser).offset(skip).limit(limit).all()
+    # Only the response fields; the password hash never leaves the database
+    users = db.query(
+        DBAdminUser.id,
+        DBAdminUser.username,
+        DBAdminUser.email,
+        DBAdminUser.is_active,
+        DBAdminUser.is_superuser,
+        DBAdminUser.created_at,
+        DBAdminUser.last_login
+    ).offset(skip).limit(limit).all()
     return users
 
 @router.put("/users/{user_id}/activate")
-async def activate_admin_user(
+def activate_admin_user(
     user_id: int,
     current_user: DBAdminUser = Depends(get_current_superuser),
     db: Session = Depends(get_db)
 ):
     """Activate/deactivate admin user (superuser only)"""
-    user = db.query(DBAdminUser).filter(DBAdminUser.id == user_id).first()
-    if not user:
+    # Flip the flag in one statement; RETURNING gives the new state
+    is_active = db.execute(
+        update(DBAdminUser)
+        .where(DBAdminUser.id == user_id)
+        .values(is_active=~DBAdminUser.is_active)
+        .returning(DBAdminUser.is_active)
+    ).scalar_one_or_none()
+    if is_active is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.is_active = not user.is_active
     db.commit()
-    return {"message": f"User {'activated' if user.is_active else 'deactivated'}"}
+    return {"message": f"User {'activated' if is_active else 'deactivated'}"}
 
 @router.delete("/users/{user_id}")
-async def delete_admin_user(
+def delete_admin_user(
     user_id: int,
     current_user: DBAdminUser = Depends(get_current_superuser),
     db: Session = Depends(get_db)
@@ -106,10 +123,9 @@ async def delete_admin_user(
     if current_user.id == user_id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
-    user = db.query(DBAdminUser).filter(DBAdminUser.id == user_id).first()
-    if not user:
+    deleted = db.execute(delete(DBAdminUser).where(DBAdminUser.id == user_id)).rowcount
+    if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
     db.commit()
     return {"message": "User deleted"}
\ No newline at end of file
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, String
-from database import get_db
+from sqlalchemy import case, exists, func, update
+from sqlalchemy.exc import IntegrityError
+from pydantic import TypeAdapter
+from database import get_db, dialect_insert
+from services.view_counts import add_view
 from models.blog import BlogPost as BlogPostModel, BlogComment, BlogLike, TemporalUser as TemporalUserModel, BlogView
 from schemas import BlogPost, BlogPostCreate, Comment, CommentCreate, Like, LikeCreate, TemporalUser, TemporalUserCreate, ViewCreate
 import logging
+from core.cache import cache
+from core.config import settings
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Set up logging (handlers and level are configured once in main.py)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -18,52 +22,87 @@ router = APIRouter()
 # Templates directory
 templates_dir = Path(__file__).parent.parent / "templates"
 templates = Jinja2Templates(directory=str(templates_dir))
+templates.env.auto_reload = settings.jinja_auto_reload
+
+# Public post reads are cached as serialized JSON; post writes drop every key under the prefix
+POSTS_CACHE_PREFIX = "blog:posts:"
+POSTS_CACHE_TTL = 60
+_post_adapter = TypeAdapter(BlogPost)
+_post_list_adapter = TypeAdapter(list[BlogPost])
+
+def _cached_response(key: str):
+    """Return the stored JSON body for key, if any"""
+    body = cache.get(key)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+def _store_response(key: str, adapter: TypeAdapter, value) -> Response:
+    """Serialize ORM value through its response schema and keep the bytes for POSTS_CACHE_TTL"""
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    cache.set(key, body, ttl=POSTS_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
 
 @router.get("/", response_model=list[BlogPost])
-async def get_blog_posts(limit: int = 10, db: Session = Depends(get_db)):
+async def get_blog_posts(limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
     """Get latest blog posts for homepage"""
+    cache_key = f"{POSTS_CACHE_PREFIX}latest:{limit}"
+    cached = _cached_response(cache_key)
+    if cached is not None:
+        return cached
+
     posts = db.query(BlogPostModel).order_by(BlogPostModel.published_at.desc()).limit(limit).all()
-    return posts
+    return _store_response(cache_key, _post_list_adapter, posts)
 
 @router.get("/tags")
 async def get_blog_tags(db: Session = Depends(get_db)):
     """Get all blog tags with post counts (public API)"""
-    from models.blog import BlogTag
-    from sqlalchemy import func
+    from models.blog import BlogTag, post_tags
     
     try:
-        # Get all tags
-        tags = db.query(BlogTag).order_by(BlogTag.name.asc()).all()
+        # Get all tags with their published post counts in one grouped query
+        tags = db.query(
+            BlogTag.id,
+            BlogTag.name,
+            BlogTag.slug,
+            BlogTag.color,
+            func.count(BlogPostModel.id).label("count")
+        ).outerjoin(
+            post_tags, post_tags.c.tag_id == BlogTag.id
+        ).outerjoin(
+            BlogPostModel,
+            (BlogPostModel.id == post_tags.c.post_id) & BlogPostModel.published_at.isnot(None)
+        ).group_by(BlogTag.id, BlogTag.name, BlogTag.slug, BlogTag.color).order_by(BlogTag.name.asc()).all()
         
-        tags_data = []
-        for tag in tags:
-            # Get actual post count for this tag (only published posts)
-            actual_count = db.query(func.count(BlogPostModel.id)).filter(
-                BlogPostModel.published_at.isnot(None),
-                cast(BlogPostModel.tags, String).like(f'%"{tag.slug}"%')
-            ).scalar() or 0
-            
-            tags_data.append({
+        tags_data = [
+            {
                 "id": str(tag.id),
                 "name": tag.name,
                 "slug": tag.slug,
-                "count": actual_count,
+                "count": tag.count,
                 "color": tag.color or "#6366f1"
-            })
+            }
+            for tag in tags
+        ]
             
         return {"tags": tags_data}
     except Exception as e:
-        logger.error(f"Error fetching tags: {e}")
+        logger.error("Error fetching tags: %s", e)
         raise HTTPException(500, "Failed to fetch tags")
 
 @router.get("/{post_id}", response_model=BlogPost)
 async def get_blog_post(post_id: int, db: Session = Depends(get_db)):
     """Get single blog post with comments"""
+    cache_key = f"{POSTS_CACHE_PREFIX}{post_id}"
+    cached = _cached_response(cache_key)
+    if cached is not None:
+        return cached
+
     post = db.query(BlogPostModel).filter(BlogPostModel.id == post_id).first()
     if not post:
         raise HTTPException(404, "Blog post not found")
 
-    return post
+    return _store_response(cache_key, _post_adapter, post)
 
 @router.post("/{post_id}/view")
 async def register_view(post_id: int, view: ViewCreate, db: Session = Depends(get_db)):
@@ -71,18 +110,21 @@ async def register_view(post_id: int, view: ViewCreate, db: Session = Depends(ge
     from datetime import datetime, timedelta
     
     # Check if post exists
-    post = db.query(BlogPostModel).filter(BlogPostModel.id == post_id).first()
+    post = db.query(BlogPostModel.view_count).filter(BlogPostModel.id == post_id).first()
     if not post:
         raise HTTPException(404, "Blog post not found")
+    view_count = post.view_count or 0
     
-    # Check for existing view within 24h
-    existing = db.query(BlogView).filter(
-        BlogView.blog_post_id == post_id,
-        BlogView.fingerprint == view.fingerprint,
-        BlogView.expires_at > func.now()
-    ).first()
+    # Check for existing view within 24h (EXISTS stops at the first match)
+    already_viewed = db.query(
+        db.query(BlogView).filter(
+            BlogView.blog_post_id == post_id,
+            BlogView.fingerprint == view.fingerprint,
+            BlogView.expires_at > func.now()
+        ).exists()
+    ).scalar()
     
-    if not existing:
+    if not already_viewed:
         # Register new unique view
         expires_at = datetime.utcnow() + timedelta(days=1)
         new_view = BlogView(
@@ -91,12 +133,13 @@ async def register_view(post_id: int, view: ViewCreate, db: Session = Depends(ge
             expires_at=expires_at
         )
         db.add(new_view)
-        
-        # Increment total views
-        post.view_count += 1
         db.commit()
-    
-    return {"view_count": post.view_count}
+
+        # The increment is buffered per worker and written to blog_posts by the scheduler
+        add_view(post_id)
+
+    # Committed total only, so every worker reports the same number; recent views show up after the next flush
+    return {"view_count": view_count}
 
 @router.post("/", response_model=BlogPost)
 async def create_blog_post(post: BlogPostCreate, db: Session = Depends(get_db)):
@@ -104,6 +147,7 @@ async def create_blog_post(post: BlogPostCreate, db: Session = Depends(get_db)):
     db_post = BlogPostModel(**post.dict())
     db.add(db_post)
     db.commit()
+    cache.delete_prefix(POSTS_CACHE_PREFIX)
     db.refresh(db_post)
     return db_post
 
@@ -131,67 +175,59 @@ async def create_comment(post_id: int, comment: CommentCreate, db: Session = Dep
 @router.post("/{post_id}/likes")
 async def like_post(post_id: int, like: LikeCreate, db: Session = Depends(get_db)):
     """Like a blog post using device fingerprint"""
-    logger.info(f"❤️ LIKE REQUEST: post_id={post_id}, like_data={like.dict()}")
-    
-    # Check if post exists
-    post = db.query(BlogPostModel).filter(BlogPostModel.id == post_id).first()
-    if not post:
-        logger.error(f"❌ LIKE REQUEST: Post not found with id={post_id}")
-        raise HTTPException(404, "Blog post not found")
+    logger.debug("❤️ LIKE REQUEST: post_id=%s, like_data=%s", post_id, like)
+    # LikeCreate falls back to user_identifier, so this is only empty when neither was sent
+    if not like.fingerprint:
+        raise HTTPException(400, "Either fingerprint or user_identifier is required")
     
-    # Check if already liked by this fingerprint
+    # The unique (blog_post_id, fingerprint) constraint decides whether this is a new like,
+    # and the counter is bumped in the same transaction without loading the post
+    insert = dialect_insert(db)
     try:
-        existing = db.query(BlogLike).filter(
-            BlogLike.blog_post_id == post_id,
-            BlogLike.fingerprint == like.fingerprint
-        ).first()
-
-        liked = False
-        if existing:
+        like_id = db.execute(
+            insert(BlogLike)
+            .values(blog_post_id=post_id, fingerprint=like.fingerprint, user_identifier=like.user_identifier)
+            .on_conflict_do_nothing(index_elements=[BlogLike.blog_post_id, BlogLike.fingerprint])
+            .returning(BlogLike.id)
+        ).scalar_one_or_none()
+
+        if like_id is None:
             # Already liked, just return success with current state
-            liked = True
-            logger.info(f"✅ LIKE REQUEST: Already liked by fingerprint={like.fingerprint}")
+            logger.debug("✅ LIKE REQUEST: Already liked by fingerprint=%s", like.fingerprint)
+            like_count = db.query(BlogPostModel.like_count).filter(BlogPostModel.id == post_id).scalar()
         else:
-            # Create new permanent like
-            db_like = BlogLike(
-                blog_post_id=post_id,
-                fingerprint=like.fingerprint,
-                user_identifier=like.user_identifier
-            )
-            db.add(db_like)
-
-            # Update like count
-            post.like_count += 1
-            liked = True
-            
-            try:
-                db.commit()
-                db.refresh(db_like)
-                logger.info(f"✅ LIKE REQUEST: New like created for fingerprint={like.fingerprint}")
-            except Exception as e:
-                # Handle possible race condition or unique constraint violation
-                db.rollback()
-                # Double check if it was created by another request
-                existing = db.query(BlogLike).filter(
-                    BlogLike.blog_post_id == post_id,
-                    BlogLike.fingerprint == like.fingerprint
-                ).first()
-                if existing:
-                     liked = True
-                else:
-                     raise e
-
-        # Get updated count
-        result = {"liked": liked, "like_count": post.like_count}
-        logger.info(f"✅ LIKE REQUEST SUCCESS: {result}")
-        return result
-        
+            like_count = db.execute(
+                update(BlogPostModel)
+                .where(BlogPostModel.id == post_id)
+                .values(like_count=BlogPostModel.like_count + 1)
+                .returning(BlogPostModel.like_count)
+            ).scalar_one_or_none()
+
+        if like_count is None:
+            db.rollback()
+        else:
+            db.commit()
+            if like_id is not None:
+                logger.debug("✅ LIKE REQUEST: New like created for fingerprint=%s", like.fingerprint)
+    except IntegrityError:
+        # With the fingerprint checked above and duplicates skipped by ON CONFLICT,
+        # the only constraint left to fail is the foreign key: the post does not exist
+        db.rollback()
+        like_count = None
     except Exception as e:
-        logger.error(f"❌ LIKE REQUEST ERROR: {str(e)}")
-        # Only rollback if not already handled
-        # db.rollback() should be handled in the inner try/except for commit
+        logger.error("❌ LIKE REQUEST ERROR: %s", e)
+        db.rollback()
         raise HTTPException(500, f"Failed to process like: {str(e)}")
 
+    if like_count is None:
+        logger.error("❌ LIKE REQUEST: Post not found with id=%s", post_id)
+        raise HTTPException(404, "Blog post not found")
+
+    # Get updated count
+    result = {"liked": True, "like_count": like_count}
+    logger.debug("✅ LIKE REQUEST SUCCESS: %s", result)
+    return result
+
 @router.delete("/{post_id}/likes")
 async def unlike_post(post_id: int, fingerprint: str = Query(None, description="Device fingerprint"), user_identifier: str = Query(None, description="Legacy user identifier"), db: Session = Depends(get_db)):
     """Unlike a blog post using device fingerprint or legacy user identifier"""
@@ -200,44 +236,43 @@ async def unlike_post(post_id: int, fingerprint: str = Query(None, description="
     if not identifier:
         raise HTTPException(400, "Either fingerprint or user_identifier is required")
     
-    logger.info(f"💔 UNLIKE REQUEST: post_id={post_id}, identifier={identifier}")
+    logger.debug("💔 UNLIKE REQUEST: post_id=%s, identifier=%s", post_id, identifier)
     
-    # Check if post exists
-    post = db.query(BlogPostModel).filter(BlogPostModel.id == post_id).first()
-    if not post:
-        logger.error(f"❌ UNLIKE REQUEST: Post not found with id={post_id}")
-        raise HTTPException(404, "Blog post not found")
-    
-    # Find existing like by fingerprint
+    # Delete the like without loading it, then lower the counter by the rows removed
     try:
-        existing = db.query(BlogLike).filter(
+        removed = db.query(BlogLike).filter(
             BlogLike.blog_post_id == post_id,
             (BlogLike.fingerprint == identifier) | (BlogLike.user_identifier == identifier)
-        ).first()
-
-        unliked = False
-        if existing:
-            # Delete like
-            db.delete(existing)
-
-            # Update like count
-            if post.like_count > 0:
-                post.like_count -= 1
-            unliked = True
+        ).delete(synchronize_session=False)
+
+        if removed:
+            like_count = db.execute(
+                update(BlogPostModel)
+                .where(BlogPostModel.id == post_id)
+                .values(like_count=case(
+                    (BlogPostModel.like_count > removed, BlogPostModel.like_count - removed),
+                    else_=0
+                ))
+                .returning(BlogPostModel.like_count)
+            ).scalar_one_or_none()
             db.commit()
-            logger.info(f"✅ UNLIKE REQUEST: Like removed for identifier={identifier}")
+            logger.debug("✅ UNLIKE REQUEST: Like removed for identifier=%s", identifier)
         else:
-            logger.info(f"⚠️ UNLIKE REQUEST: No like found for identifier={identifier}")
-
-        result = {"unliked": unliked, "like_count": post.like_count}
-        logger.info(f"✅ UNLIKE REQUEST SUCCESS: {result}")
-        return result
-        
+            logger.debug("⚠️ UNLIKE REQUEST: No like found for identifier=%s", identifier)
+            like_count = db.query(BlogPostModel.like_count).filter(BlogPostModel.id == post_id).scalar()
     except Exception as e:
-        logger.error(f"❌ UNLIKE REQUEST ERROR: {str(e)}")
+        logger.error("❌ UNLIKE REQUEST ERROR: %s", e)
         db.rollback()
         raise HTTPException(500, f"Failed to process unlike: {str(e)}")
 
+    if like_count is None:
+        logger.error("❌ UNLIKE REQUEST: Post not found with id=%s", post_id)
+        raise HTTPException(404, "Blog post not found")
+
+    result = {"unliked": bool(removed), "like_count": like_count}
+    logger.debug("✅ UNLIKE REQUEST SUCCESS: %s", result)
+    return result
+
 @router.get("/{post_id}/likes/status")
 async def get_like_status(post_id: int, fingerprint: str = Query(None, description="Device fingerprint"), user_identifier: str = Query(None, description="Legacy user identifier"), db: Session = Depends(get_db)):
     """Check if user has liked a post using device fingerprint or legacy user identifier"""
@@ -246,19 +281,19 @@ async def get_like_status(post_id: int, fingerprint: str = Query(None, descripti
     if not identifier:
         raise HTTPException(400, "Either fingerprint or user_identifier is required")
     
-    logger.info(f"🔍 LIKE STATUS REQUEST: post_id={post_id}, identifier={identifier}")
+    logger.debug("🔍 LIKE STATUS REQUEST: post_id=%s, identifier=%s", post_id, identifier)
     
     try:
-        existing = db.query(BlogLike).filter(
+        liked = db.query(exists().where(
             BlogLike.blog_post_id == post_id,
             (BlogLike.fingerprint == identifier) | (BlogLike.user_identifier == identifier)
-        ).first()
-        
-        result = {"liked": existing is not None}
-        logger.info(f"✅ LIKE STATUS RESULT: {result}")
+        )).scalar()
+
+        result = {"liked": liked}
+        logger.debug("✅ LIKE STATUS RESULT: %s", result)
         return result
     except Exception as e:
-        logger.error(f"❌ LIKE STATUS ERROR: {str(e)}")
+        logger.error("❌ LIKE STATUS ERROR: %s", e)
         raise
 
 @router.get("/{post_id}/comments", response_model=list[Comment])
@@ -274,17 +309,16 @@ async def get_comments(post_id: int, db: Session = Depends(get_db)):
 @router.get("/{post_id}/comments-tree")
 async def get_comments_tree(post_id: int, db: Session = Depends(get_db)):
     """Get approved comments for a blog post with nested replies"""
-    # Get all approved comments for this post
+    # Get all approved comments for this post; the id tiebreak keeps parents ahead of their replies
     all_comments = db.query(BlogComment).filter(
         BlogComment.blog_post_id == post_id,
         BlogComment.is_approved == True
-    ).order_by(BlogComment.created_at).all()
+    ).order_by(BlogComment.created_at, BlogComment.id).all()
 
-    # Build comment tree
+    # Build comment tree in one pass, attaching each comment to its parent as it arrives
     comment_dict = {}
     root_comments = []
 
-    # First pass: create comment objects
     for comment in all_comments:
         comment_data = {
             "id": comment.id,
@@ -295,14 +329,9 @@ async def get_comments_tree(post_id: int, db: Session = Depends(get_db)):
         }
         comment_dict[comment.id] = comment_data
 
-    # Second pass: build hierarchy
-    for comment in all_comments:
-        if comment.parent_id and comment.parent_id in comment_dict:
-            # This is a reply
-            comment_dict[comment.parent_id]["replies"].append(comment_dict[comment.id])
-        else:
-            # This is a root comment
-            root_comments.append(comment_dict[comment.id])
+        # Replies to a missing (unapproved) parent are shown as root comments
+        parent = comment_dict.get(comment.parent_id) if comment.parent_id else None
+        (parent["replies"] if parent else root_comments).append(comment_data)
 
     return {"comments": root_comments}
 
@@ -326,12 +355,18 @@ async def delete_blog_post(post_id: int, db: Session = Depends(get_db)):
 
     db.delete(post)
     db.commit()
+    cache.delete_prefix(POSTS_CACHE_PREFIX)
     return {"message": "Blog post deleted"}
 
 # Section-based endpoints for homepage
 @router.get("/posts/section/{section}", response_model=list[BlogPost])
-async def get_posts_by_section(section: str, limit: int = 10, db: Session = Depends(get_db)):
+async def get_posts_by_section(section: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
     """Get blog posts by section (latest, popular, trending, others)"""
+    cache_key = f"{POSTS_CACHE_PREFIX}section:{section}:{limit}"
+    cached = _cached_response(cache_key)
+    if cached is not None:
+        return cached
+
     if section == "latest":
         # Recent: Show the newest posts
         posts = db.query(BlogPostModel).order_by(BlogPostModel.published_at.desc()).limit(limit).all()
@@ -377,7 +412,7 @@ async def get_posts_by_section(section: str, limit: int = 10, db: Session = Depe
                 posts = db.query(BlogPostModel).order_by(BlogPostModel.view_count.desc()).limit(limit).all()
                 
         except Exception as e:
-            logger.warning(f"Trending calculation failed, using fallback: {e}")
+            logger.warning("Trending calculation failed, using fallback: %s", e)
             # Fallback to most viewed posts if trending calculation fails
             posts = db.query(BlogPostModel).order_by(BlogPostModel.view_count.desc()).limit(limit).all()
     elif section == "featured":
@@ -388,7 +423,7 @@ async def get_posts_by_section(section: str, limit: int = 10, db: Session = Depe
     else:
         raise HTTPException(400, f"Invalid section: {section}")
 
-    return posts
+    return _store_response(cache_key, _post_list_adapter, posts)
 
 @router.get("/blog/media", response_class=HTMLResponse)
 @router.get("/blog/media/", response_class=HTMLResponse)
@@ -477,7 +512,7 @@ async def create_temporal_user(user: TemporalUserCreate, request: Request, db: S
 @router.get("/temporal-users/{fingerprint}", response_model=TemporalUser)
 async def get_temporal_user(fingerprint: str, db: Session = Depends(get_db)):
     """Get temporal user by fingerprint"""
-    logger.info(f'🔍 GET TEMPORAL USER: Looking up fingerprint={fingerprint}')
+    logger.debug('🔍 GET TEMPORAL USER: Looking up fingerprint=%s', fingerprint)
     try:
         user = db.query(TemporalUserModel).filter(
             TemporalUserModel.fingerprint == fingerprint,
@@ -485,21 +520,21 @@ async def get_temporal_user(fingerprint: str, db: Session = Depends(get_db)):
         ).first()
 
         if not user:
-            logger.info(f'🔍 GET TEMPORAL USER: User not found or expired for fingerprint={fingerprint}')
+            logger.debug('🔍 GET TEMPORAL USER: User not found or expired for fingerprint=%s', fingerprint)
             raise HTTPException(404, "User not found or expired")
 
         # Update last seen
         user.last_seen = func.now()
         db.commit()
         
-        logger.info(f'🔍 GET TEMPORAL USER: Found user id={user.id}, name={user.name}')
+        logger.debug('🔍 GET TEMPORAL USER: Found user id=%s, name=%s', user.id, user.name)
         return user
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f'🔍 GET TEMPORAL USER: Error: {type(e).__name__}: {str(e)}')
+        logger.error('🔍 GET TEMPORAL USER: Error: %s: %s', type(e).__name__, e)
         import traceback
-        logger.error(f'🔍 GET TEMPORAL USER: Traceback: {traceback.format_exc()}')
+        logger.error('🔍 GET TEMPORAL USER: Traceback: %s', traceback.format_exc())
         raise HTTPException(500, f"Internal server error: {str(e)}")
 
 @router.delete("/temporal-users/expired")
@@ -1,6 +1,9 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from core.config import settings
 from services.newsletter_service import NewsletterService
+from services.view_counts import flush_view_counts
 from database import get_db
 from sqlalchemy.orm import Session
 from models.blog import BlogLike, TemporalUser as TemporalUserModel, BlogPost as BlogPostModel
@@ -76,9 +79,19 @@ def init_scheduler():
         replace_existing=True
     )
 
+    # Write buffered post view counts back to blog_posts
+    scheduler.add_job(
+        flush_view_counts,
+        trigger=IntervalTrigger(seconds=settings.view_count_flush_interval),
+        id='flush_view_counts',
+        name='Flush Buffered View Counts',
+        replace_existing=True
+    )
+
     print("Scheduler initialized:")
     print("- Weekly newsletter scheduled for every Monday at 9 AM")
     print("- Daily cleanup scheduled for every day at 2 AM")
+    print(f"- View counts flushed every {settings.view_count_flush_interval} seconds")
 
 def start_scheduler():
     """Start the scheduler"""
@@ -29,6 +29,34 @@ class BlogPost(BlogPostBase):
     class Config:
         from_attributes = True
 
+class AdminBlogPostCreate(BaseModel):
+    title: str = ""
+    content: Optional[str] = ""
+    excerpt: Optional[str] = None
+    template_type: Optional[str] = None
+    featured_image: Optional[str] = None
+    video_url: Optional[str] = None
+    tags: Optional[List[str]] = None
+    section: Optional[str] = 'others'
+    slug: Optional[str] = None
+    priority: Optional[int] = 0
+    is_featured: Optional[bool] = False
+    published_at: Optional[datetime] = None
+
+class AdminBlogDraft(BaseModel):
+    id: Optional[int] = None
+    title: str = "Untitled Draft"
+    content: Optional[str] = ""
+    excerpt: Optional[str] = ""
+    template_type: Optional[str] = "template1"
+    featured_image: Optional[str] = ""
+    video_url: Optional[str] = ""
+    tags: Optional[List[str]] = []
+    section: Optional[str] = 'others'
+    slug: Optional[str] = None
+    priority: Optional[int] = 0
+    is_featured: Optional[bool] = False
+
 class BlogPostSearchResult(BlogPost):
     search_score: Optional[float] = None
     matched_terms: Optional[List[str]] = None
@@ -301,6 +329,13 @@ class ReferralAnalytics(ReferralAnalyticsBase):
     class Config:
         from_attributes = True
 
+class AnalyticsTrackBatch(BaseModel):
+    """Tracking events collected by the browser and sent in one request"""
+    pageviews: List[PageViewAnalyticsCreate] = []
+    engagements: List[ContentEngagementAnalyticsCreate] = []
+    sessions: List[UserSessionAnalyticsCreate] = []
+    referrals: List[ReferralAnalyticsCreate] = []
+
 class AnalyticsDashboardResponse(BaseModel):
     total_views: int
     total_sessions: int
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from core.cache import cache
+from core.config import settings
+from database import SessionLocal
+from services.analytics_service import AnalyticsService, LIVE_CACHE_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Tracking events waiting to be written: (event type, received at, payload)
+event_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.analytics_queue_size)
+
+_flush_task: Optional[asyncio.Task] = None
+
+# Events dropped because the queue was full; the warning repeats every OVERFLOW_LOG_EVERY drops
+_dropped_events = 0
+OVERFLOW_LOG_EVERY = 1000
+
+
+def enqueue_event(event_type: str, data) -> None:
+    """Queue a tracking event for the next batch, dropping the oldest one if the queue is full"""
+    global _dropped_events
+    event = (event_type, datetime.now(), data)
+    try:
+        event_queue.put_nowait(event)
+    except asyncio.QueueFull:
+        event_queue.get_nowait()
+        event_queue.put_nowait(event)
+        _dropped_events += 1
+        if _dropped_events % OVERFLOW_LOG_EVERY == 1:
+            logger.warning("Analytics queue full, %d events dropped so far", _dropped_events)
+
+
+def write_batch(batch: List[Tuple[str, datetime, object]]) -> None:
+    """Write a batch of queued events with a single commit, splitting it if the database rejects its data"""
+    grouped = {"pageview": [], "engagement": [], "referral": []}
+    for event_type, received_at, data in batch:
+        grouped[event_type].append((received_at, data))
+
+    db = SessionLocal()
+    try:
+        AnalyticsService(db).track_batch(
+            page_views=grouped["pageview"],
+            engagements=grouped["engagement"],
+            referrals=grouped["referral"]
+        )
+        cache.delete_prefix(LIVE_CACHE_PREFIX)
+        return
+    except Exception as e:
+        error = e
+    finally:
+        db.close()
+
+    # A bad event (e.g. a value too long for its column) should only lose itself, so retry the halves;
+    # each on its own session, so the split never holds more than one connection
+    if len(batch) > 1 and isinstance(error.__cause__, (IntegrityError, DataError)):
+        middle = len(batch) // 2
+        write_batch(batch[:middle])
+        write_batch(batch[middle:])
+    else:
+        logger.error("Dropped %d analytics events: %s", len(batch), error)
+
+
+async def _flush_loop() -> None:
+    """Collect events until the batch is full or the flush interval has passed, then write them"""
+    loop = asyncio.get_running_loop()
+    batch = []
+    try:
+        while True:
+            batch.append(await event_queue.get())
+            deadline = loop.time() + settings.analytics_flush_interval
+            while len(batch) < settings.analytics_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(event_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            pending, batch = batch, []
+            await run_in_threadpool(write_batch, pending)
+    except asyncio.CancelledError:
+        if batch:
+            write_batch(batch)
+        raise
+
+
+def start_analytics_buffer() -> None:
+    """Start the background task that flushes queued tracking events"""
+    global _flush_task
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop_analytics_buffer() -> None:
+    """Stop the flush task and write whatever is still queued"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+
+    remaining = []
+    while not event_queue.empty():
+        remaining.append(event_queue.get_nowait())
+    for start in range(0, len(remaining), settings.analytics_batch_size):
+        write_batch(remaining[start:start + settings.analytics_batch_size])
@@ -3,15 +3,18 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 import asyncio
+from urllib.parse import urlparse
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_, or_, text
+from database import dialect_insert
+from sqlalchemy import func, desc, and_, or_, select, text, update
 from user_agents import parse as parse_user_agent
 
 from models.blog import (
     PageViewAnalytics, ContentEngagementAnalytics, UserSessionAnalytics,
     ReferralAnalytics, DeviceAnalytics, GeographicAnalytics, RealTimeMetrics,
-    AnalyticsReports, BlogPost, SearchAnalytics, NewsletterSubscriber
+    AnalyticsReports, BlogPost, SearchAnalytics, NewsletterSubscriber,
+    PageViewHourly, PageViewDimensionHourly
 )
 from schemas.blog import (
     PageViewAnalyticsCreate, ContentEngagementAnalyticsCreate,
@@ -19,6 +22,14 @@ from schemas.blog import (
     AnalyticsDashboardResponse, AnalyticsReportRequest
 )
 
+# Cached analytics responses under this prefix are dropped after new events are written
+LIVE_CACHE_PREFIX = "analytics:live:"
+
+# Page view columns broken down in PageViewDimensionHourly
+ROLLUP_DIMENSIONS = ("device_type", "country", "referrer_domain")
+# Rows per rollup upsert statement, keeping bound parameters under the driver limits
+ROLLUP_CHUNK_SIZE = 1000
+
 class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
@@ -26,28 +37,13 @@ class AnalyticsService:
     def track_page_view(self, analytics_data: PageViewAnalyticsCreate) -> PageViewAnalytics:
         """Track a page view with comprehensive analytics data"""
         try:
-            # Parse user agent for device/browser info
-            if analytics_data.user_agent:
-                ua = parse_user_agent(analytics_data.user_agent)
-                analytics_data.device_type = self._get_device_type(ua)
-                analytics_data.browser = ua.browser.family if ua.browser.family else None
-                analytics_data.os = ua.os.family if ua.os.family else None
-
-            # Hash IP for privacy
-            if analytics_data.ip_address:
-                analytics_data.user_identifier = hashlib.sha256(
-                    analytics_data.ip_address.encode()
-                ).hexdigest()[:16]
-
-            # Extract referrer domain
-            if analytics_data.referrer:
-                from urllib.parse import urlparse
-                parsed = urlparse(analytics_data.referrer)
-                analytics_data.referrer_domain = parsed.netloc
+            self._enrich_page_view(analytics_data)
 
             # Create analytics record
-            page_view = PageViewAnalytics(**analytics_data.dict())
+            row = {**analytics_data.dict(), "timestamp": datetime.now()}
+            page_view = PageViewAnalytics(**row)
             self.db.add(page_view)
+            self._roll_up_page_views([row])
             self.db.commit()
             self.db.refresh(page_view)
 
@@ -109,6 +105,35 @@ class AnalyticsService:
             self.db.rollback()
             raise Exception(f"Failed to track session: {str(e)}")
 
+    def track_sessions(self, sessions: List[UserSessionAnalyticsCreate]) -> int:
+        """Create or update several user sessions in one transaction"""
+        try:
+            session_ids = {session_data.session_id for session_data in sessions}
+            existing = {
+                session.session_id: session
+                for session in self.db.query(UserSessionAnalytics).filter(
+                    UserSessionAnalytics.session_id.in_(session_ids)
+                )
+            }
+
+            for session_data in sessions:
+                session = existing.get(session_data.session_id)
+                if session:
+                    for key, value in session_data.dict(exclude_unset=True).items():
+                        if hasattr(session, key):
+                            setattr(session, key, value)
+                else:
+                    session = UserSessionAnalytics(**session_data.dict())
+                    self.db.add(session)
+                    existing[session_data.session_id] = session
+
+            self.db.commit()
+            return len(sessions)
+
+        except Exception as e:
+            self.db.rollback()
+            raise Exception(f"Failed to track sessions: {str(e)}")
+
     def track_referral(self, referral_data: ReferralAnalyticsCreate) -> ReferralAnalytics:
         """Track referral and UTM data"""
         try:
@@ -122,44 +147,99 @@ class AnalyticsService:
             self.db.rollback()
             raise Exception(f"Failed to track referral: {str(e)}")
 
-    def get_dashboard_data(self, timeframe_days: int = 30) -> AnalyticsDashboardResponse:
-        """Get comprehensive dashboard analytics data"""
+    def track_batch(
+        self,
+        page_views: List[Tuple[datetime, PageViewAnalyticsCreate]] = (),
+        engagements: List[Tuple[datetime, ContentEngagementAnalyticsCreate]] = (),
+        referrals: List[Tuple[datetime, ReferralAnalyticsCreate]] = ()
+    ) -> int:
+        """Insert buffered tracking events, each stamped with its receive time, in one transaction"""
         try:
-            start_date = datetime.now() - timedelta(days=timeframe_days)
+            # post_id comes from the client; events for posts that do not exist would fail the foreign key
+            known_posts = self._existing_post_ids(data.post_id for _, data in (*page_views, *engagements))
+            page_views = [(received_at, data) for received_at, data in page_views if not data.post_id or data.post_id in known_posts]
+            engagements = [(received_at, data) for received_at, data in engagements if not data.post_id or data.post_id in known_posts]
+
+            metrics = Counter()
+
+            if page_views:
+                rows = []
+                post_views = Counter()
+                for received_at, analytics_data in page_views:
+                    self._enrich_page_view(analytics_data)
+                    rows.append({**analytics_data.dict(), "timestamp": received_at})
+                    if analytics_data.post_id:
+                        post_views[analytics_data.post_id] += 1
+                        metrics[("page_views", f"post_{analytics_data.post_id}", "24h")] += 1
+                self.db.bulk_insert_mappings(PageViewAnalytics, rows)
+                self._roll_up_page_views(rows)
+                metrics[("active_users", "active_users_5m", "5m")] += len(rows)
+                metrics[("page_views", "total", "24h")] += len(rows)
+
+                # In id order, like every other writer of blog_posts.view_count, so concurrent batches cannot deadlock
+                for post_id, views in sorted(post_views.items()):
+                    self.db.execute(
+                        update(BlogPost)
+                        .where(BlogPost.id == post_id)
+                        .values(view_count=BlogPost.view_count + views)
+                    )
+
+            if engagements:
+                self.db.bulk_insert_mappings(ContentEngagementAnalytics, [
+                    {**engagement_data.dict(), "timestamp": received_at}
+                    for received_at, engagement_data in engagements
+                ])
+                for _, engagement_data in engagements:
+                    metric_key = f"{engagement_data.action_type}_{engagement_data.post_id or 'general'}"
+                    metrics[("engagement", metric_key, "1h")] += 1
+
+            if referrals:
+                self.db.bulk_insert_mappings(ReferralAnalytics, [
+                    {**referral_data.dict(), "timestamp": received_at}
+                    for received_at, referral_data in referrals
+                ])
+
+            for (metric_type, metric_key, time_window), value in metrics.items():
+                self._add_metric(metric_type, metric_key, value, time_window)
 
-            # Basic metrics
-            total_views = self.db.query(func.count(PageViewAnalytics.id)).filter(
-                PageViewAnalytics.timestamp >= start_date
-            ).scalar() or 0
+            self.db.commit()
+            return len(page_views) + len(engagements) + len(referrals)
 
-            total_sessions = self.db.query(func.count(func.distinct(UserSessionAnalytics.session_id))).filter(
-                UserSessionAnalytics.start_time >= start_date
-            ).scalar() or 0
+        except Exception as e:
+            self.db.rollback()
+            raise Exception(f"Failed to track analytics batch: {str(e)}") from e
 
-            total_users = self.db.query(func.count(func.distinct(PageViewAnalytics.user_identifier))).filter(
-                PageViewAnalytics.timestamp >= start_date
-            ).scalar() or 0
+    def _existing_post_ids(self, post_ids) -> set:
+        """The subset of post_ids that exist, looked up in one query"""
+        post_ids = {post_id for post_id in post_ids if post_id}
+        if not post_ids:
+            return set()
+        return set(self.db.scalars(select(BlogPost.id).where(BlogPost.id.in_(post_ids))))
 
-            # Real-time metrics (last 5 minutes)
-            realtime_cutoff = datetime.now() - timedelta(minutes=5)
-            active_users = self.db.query(func.count(func.distinct(PageViewAnalytics.user_identifier))).filter(
-                PageViewAnalytics.timestamp >= realtime_cutoff
-            ).scalar() or 0
+    def backfill_rollups(self) -> bool:
+        """Build the hourly rollups from the raw page views if they are still empty"""
+        try:
+            if self.db.query(PageViewHourly.bucket).first() or self.db.query(PageViewDimensionHourly.bucket).first():
+                return False
 
-            # Today's and yesterday's views
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            yesterday_start = today_start - timedelta(days=1)
+            rows = self.db.query(
+                PageViewAnalytics.timestamp,
+                PageViewAnalytics.post_id,
+                *[getattr(PageViewAnalytics, dimension) for dimension in ROLLUP_DIMENSIONS]
+            ).filter(PageViewAnalytics.timestamp.isnot(None)).yield_per(ROLLUP_CHUNK_SIZE)
+            self._roll_up_page_views(row._mapping for row in rows)
+            self.db.commit()
+            return True
 
-            page_views_today = self.db.query(func.count(PageViewAnalytics.id)).filter(
-                PageViewAnalytics.timestamp >= today_start
-            ).scalar() or 0
+        except Exception as e:
+            self.db.rollback()
+            raise Exception(f"Failed to backfill analytics rollups: {str(e)}")
 
-            page_views_yesterday = self.db.query(func.count(PageViewAnalytics.id)).filter(
-                and_(
-                    PageViewAnalytics.timestamp >= yesterday_start,
-                    PageViewAnalytics.timestamp < today_start
-                )
-            ).scalar() or 0
+    def get_dashboard_data(self, timeframe_days: int = 30) -> AnalyticsDashboardResponse:
+        """Get comprehensive dashboard analytics data"""
+        try:
+            start_date = datetime.now() - timedelta(days=timeframe_days)
+            totals = self._get_view_totals(start_date)
 
             # Top content
             top_content = self._get_top_content(start_date, limit=10)
@@ -180,12 +260,7 @@ class AnalyticsService:
             real_time_metrics = self._get_realtime_metrics()
 
             return AnalyticsDashboardResponse(
-                total_views=total_views,
-                total_sessions=total_sessions,
-                total_users=total_users,
-                active_users=active_users,
-                page_views_today=page_views_today,
-                page_views_yesterday=page_views_yesterday,
+                **totals,
                 top_content=top_content,
                 popular_searches=popular_searches,
                 device_breakdown=device_breakdown,
@@ -197,6 +272,70 @@ class AnalyticsService:
         except Exception as e:
             raise Exception(f"Failed to get dashboard data: {str(e)}")
 
+    def get_summary_data(self, timeframe_days: int = 7) -> Dict[str, Any]:
+        """Get the dashboard counters without the breakdown lists"""
+        try:
+            start_date = datetime.now() - timedelta(days=timeframe_days)
+            summary = self._get_view_totals(start_date)
+
+            # Number of entries the dashboard's top content list would have
+            top_posts = self.db.query(PageViewHourly.post_id).join(
+                BlogPost, PageViewHourly.post_id == BlogPost.id
+            ).filter(
+                PageViewHourly.bucket >= start_date.replace(minute=0, second=0, microsecond=0)
+            ).group_by(PageViewHourly.post_id).limit(10).subquery()
+            summary["top_content_count"] = self.db.query(func.count()).select_from(top_posts).scalar()
+
+            return summary
+
+        except Exception as e:
+            raise Exception(f"Failed to get summary data: {str(e)}")
+
+    def _get_view_totals(self, start_date: datetime) -> Dict[str, int]:
+        """Headline view, session and user counts since start_date"""
+        # Basic metrics
+        total_views = self.db.query(func.count(PageViewAnalytics.id)).filter(
+            PageViewAnalytics.timestamp >= start_date
+        ).scalar() or 0
+
+        total_sessions = self.db.query(func.count(func.distinct(UserSessionAnalytics.session_id))).filter(
+            UserSessionAnalytics.start_time >= start_date
+        ).scalar() or 0
+
+        total_users = self.db.query(func.count(func.distinct(PageViewAnalytics.user_identifier))).filter(
+            PageViewAnalytics.timestamp >= start_date
+        ).scalar() or 0
+
+        # Real-time metrics (last 5 minutes)
+        realtime_cutoff = datetime.now() - timedelta(minutes=5)
+        active_users = self.db.query(func.count(func.distinct(PageViewAnalytics.user_identifier))).filter(
+            PageViewAnalytics.timestamp >= realtime_cutoff
+        ).scalar() or 0
+
+        # Today's and yesterday's views
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        yesterday_start = today_start - timedelta(days=1)
+
+        page_views_today = self.db.query(func.count(PageViewAnalytics.id)).filter(
+            PageViewAnalytics.timestamp >= today_start
+        ).scalar() or 0
+
+        page_views_yesterday = self.db.query(func.count(PageViewAnalytics.id)).filter(
+            and_(
+                PageViewAnalytics.timestamp >= yesterday_start,
+                PageViewAnalytics.timestamp < today_start
+            )
+        ).scalar() or 0
+
+        return {
+            "total_views": total_views,
+            "total_sessions": total_sessions,
+            "total_users": total_users,
+            "active_users": active_users,
+            "page_views_today": page_views_today,
+            "page_views_yesterday": page_views_yesterday
+        }
+
     def generate_report(self, report_request: AnalyticsReportRequest) -> AnalyticsReports:
         """Generate detailed analytics report"""
         try:
@@ -285,6 +424,80 @@ class AnalyticsService:
         else:
             return "unknown"
 
+    def _enrich_page_view(self, analytics_data: PageViewAnalyticsCreate) -> PageViewAnalyticsCreate:
+        """Fill in device, hashed visitor and referrer domain fields from the raw request data"""
+        # Parse user agent for device/browser info
+        if analytics_data.user_agent:
+            ua = parse_user_agent(analytics_data.user_agent)
+            analytics_data.device_type = self._get_device_type(ua)
+            analytics_data.browser = ua.browser.family if ua.browser.family else None
+            analytics_data.os = ua.os.family if ua.os.family else None
+
+        # Hash IP for privacy
+        if analytics_data.ip_address:
+            analytics_data.user_identifier = hashlib.sha256(
+                analytics_data.ip_address.encode()
+            ).hexdigest()[:16]
+
+        # Extract referrer domain
+        if analytics_data.referrer:
+            parsed = urlparse(analytics_data.referrer)
+            analytics_data.referrer_domain = parsed.netloc
+
+        return analytics_data
+
+    def _roll_up_page_views(self, rows) -> None:
+        """Add page view rows (mappings with timestamp, post_id and the rollup dimensions) to the hourly rollups"""
+        post_views = Counter()
+        dimension_views = Counter()
+        for row in rows:
+            bucket = row["timestamp"].replace(minute=0, second=0, microsecond=0)
+            if row.get("post_id"):
+                post_views[(bucket, row["post_id"])] += 1
+            for dimension in ROLLUP_DIMENSIONS:
+                value = row.get(dimension)
+                if value:
+                    dimension_views[(dimension, bucket, value)] += 1
+
+        self._upsert_views(PageViewHourly, [
+            {"bucket": bucket, "post_id": post_id, "views": views}
+            for (bucket, post_id), views in post_views.items()
+        ])
+        self._upsert_views(PageViewDimensionHourly, [
+            {"dimension": dimension, "bucket": bucket, "value": value, "views": views}
+            for (dimension, bucket, value), views in dimension_views.items()
+        ])
+
+    def _upsert_views(self, model, values: List[Dict[str, Any]]) -> None:
+        """Insert rollup rows, adding to the views of rows that already exist"""
+        insert = dialect_insert(self.db)
+        key_columns = [column.name for column in model.__table__.primary_key]
+        # Workers flush the same hot keys concurrently; upserting in primary key order makes every
+        # transaction take the row locks in the same order, so they queue instead of deadlocking
+        values = sorted(values, key=lambda row: tuple(row[column] for column in key_columns))
+        for start in range(0, len(values), ROLLUP_CHUNK_SIZE):
+            stmt = insert(model).values(values[start:start + ROLLUP_CHUNK_SIZE])
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={"views": model.views + stmt.excluded.views}
+            ))
+
+    def _dimension_views(self, dimension: str, start_date: datetime, limit: Optional[int] = None):
+        """Views per value of a rollup dimension since the hour containing start_date"""
+        views = func.sum(PageViewDimensionHourly.views).label('views')
+        query = self.db.query(
+            PageViewDimensionHourly.value,
+            views
+        ).filter(
+            PageViewDimensionHourly.dimension == dimension,
+            PageViewDimensionHourly.bucket >= start_date.replace(minute=0, second=0, microsecond=0)
+        ).group_by(
+            PageViewDimensionHourly.value
+        ).order_by(desc(views))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
     def _increment_post_views(self, post_id: int):
         """Increment view count for a blog post"""
         try:
@@ -323,47 +536,51 @@ class AnalyticsService:
     async def _update_metric(self, metric_type: str, metric_key: str, value: float, time_window: str):
         """Update a real-time metric"""
         try:
-            # Check if metric exists
-            existing = self.db.query(RealTimeMetrics).filter(
-                and_(
-                    RealTimeMetrics.metric_type == metric_type,
-                    RealTimeMetrics.metric_key == metric_key,
-                    RealTimeMetrics.time_window == time_window
-                )
-            ).first()
-
-            if existing:
-                existing.metric_value += value
-                existing.last_updated = datetime.now()
-            else:
-                new_metric = RealTimeMetrics(
-                    metric_type=metric_type,
-                    metric_key=metric_key,
-                    metric_value=value,
-                    time_window=time_window,
-                    data_type="count"
-                )
-                self.db.add(new_metric)
-
+            self._add_metric(metric_type, metric_key, value, time_window)
             self.db.commit()
 
         except Exception as e:
             self.db.rollback()
             print(f"Failed to update metric {metric_type}:{metric_key}: {e}")
 
+    def _add_metric(self, metric_type: str, metric_key: str, value: float, time_window: str):
+        """Add to a real-time metric in the current transaction"""
+        # Check if metric exists
+        existing = self.db.query(RealTimeMetrics).filter(
+            and_(
+                RealTimeMetrics.metric_type == metric_type,
+                RealTimeMetrics.metric_key == metric_key,
+                RealTimeMetrics.time_window == time_window
+            )
+        ).first()
+
+        if existing:
+            existing.metric_value += value
+            existing.last_updated = datetime.now()
+        else:
+            new_metric = RealTimeMetrics(
+                metric_type=metric_type,
+                metric_key=metric_key,
+                metric_value=value,
+                time_window=time_window,
+                data_type="count"
+            )
+            self.db.add(new_metric)
+
     def _get_top_content(self, start_date: datetime, limit: int = 10) -> List[Dict[str, Any]]:
         """Get most viewed content"""
         try:
+            # Read from the hourly rollup, counted from the start of start_date's hour
             results = self.db.query(
-                PageViewAnalytics.post_id,
+                PageViewHourly.post_id,
                 BlogPost.title,
-                func.count(PageViewAnalytics.id).label('views')
+                func.sum(PageViewHourly.views).label('views')
             ).join(
-                BlogPost, PageViewAnalytics.post_id == BlogPost.id
+                BlogPost, PageViewHourly.post_id == BlogPost.id
             ).filter(
-                PageViewAnalytics.timestamp >= start_date
+                PageViewHourly.bucket >= start_date.replace(minute=0, second=0, microsecond=0)
             ).group_by(
-                PageViewAnalytics.post_id, BlogPost.title
+                PageViewHourly.post_id, BlogPost.title
             ).order_by(
                 desc('views')
             ).limit(limit).all()
@@ -412,19 +629,9 @@ class AnalyticsService:
     def _get_device_breakdown(self, start_date: datetime) -> Dict[str, int]:
         """Get device type breakdown"""
         try:
-            results = self.db.query(
-                PageViewAnalytics.device_type,
-                func.count(PageViewAnalytics.id).label('count')
-            ).filter(
-                and_(
-                    PageViewAnalytics.timestamp >= start_date,
-                    PageViewAnalytics.device_type.isnot(None)
-                )
-            ).group_by(
-                PageViewAnalytics.device_type
-            ).all()
+            results = self._dimension_views("device_type", start_date)
 
-            return {row.device_type: row.count for row in results}
+            return {row.value: row.views for row in results}
 
         except Exception as e:
             print(f"Failed to get device breakdown: {e}")
@@ -433,24 +640,12 @@ class AnalyticsService:
     def _get_geographic_data(self, start_date: datetime, limit: int = 10) -> List[Dict[str, Any]]:
         """Get geographic visitor data"""
         try:
-            results = self.db.query(
-                PageViewAnalytics.country,
-                func.count(PageViewAnalytics.id).label('visitors')
-            ).filter(
-                and_(
-                    PageViewAnalytics.timestamp >= start_date,
-                    PageViewAnalytics.country.isnot(None)
-                )
-            ).group_by(
-                PageViewAnalytics.country
-            ).order_by(
-                desc('visitors')
-            ).limit(limit).all()
+            results = self._dimension_views("country", start_date, limit)
 
             return [
                 {
-                    "country": row.country,
-                    "visitors": row.visitors
+                    "country": row.value,
+                    "visitors": row.views
                 }
                 for row in results
             ]
@@ -462,25 +657,12 @@ class AnalyticsService:
     def _get_referral_sources(self, start_date: datetime, limit: int = 10) -> List[Dict[str, Any]]:
         """Get referral source data"""
         try:
-            results = self.db.query(
-                PageViewAnalytics.referrer_domain,
-                func.count(PageViewAnalytics.id).label('visits')
-            ).filter(
-                and_(
-                    PageViewAnalytics.timestamp >= start_date,
-                    PageViewAnalytics.referrer_domain.isnot(None),
-                    PageViewAnalytics.referrer_domain != ""
-                )
-            ).group_by(
-                PageViewAnalytics.referrer_domain
-            ).order_by(
-                desc('visits')
-            ).limit(limit).all()
+            results = self._dimension_views("referrer_domain", start_date, limit)
 
             return [
                 {
-                    "domain": row.referrer_domain,
-                    "visits": row.visits
+                    "domain": row.value,
+                    "visits": row.views
                 }
                 for row in results
             ]
@@ -13,7 +13,7 @@ from fastapi import UploadFile, HTTPException
 
 from models.blog import (
     BlogPost, MediaFile, ContentRevision, ContentWorkflow,
-    SEOMetadata, ContentTemplate, ContentAnalytics, BulkOperation
+    SEOMetadata, ContentTemplate, ContentAnalytics, BulkOperation, unlink_posts
 )
 from schemas.blog import (
     BlogPostCreate, BlogPost as BlogPostSchema, ContentRevisionCreate,
@@ -559,6 +559,7 @@ class ContentService:
     def _bulk_delete(self, post_ids: List[int]):
         """Bulk delete posts"""
         # This would include proper cleanup of related data
+        unlink_posts(self.db.connection(), post_ids)
         self.db.query(BlogPost).filter(BlogPost.id.in_(post_ids)).delete()
 
     def _bulk_update_tags(self, post_ids: List[int], tag_data: Dict[str, Any]):
@@ -5,7 +5,7 @@ import time
 import re
 import logging
 from datetime import datetime
-from models.blog import BlogPost, SearchAnalytics
+from models.blog import BlogPost, SearchAnalytics, tagged_with
 from schemas.blog import SearchRequest, SearchResponse, BlogPostSearchResult, SearchSuggestions
 
 # Initialize logger
@@ -36,13 +36,8 @@ class SearchService:
 
         # Apply tag filters
         if search_request.tags:
-            tag_conditions = []
-            for tag in search_request.tags:
-                # Cross-database compatible JSON array search (works for SQLite and PostgreSQL)
-                tag_conditions.append(cast(BlogPost.tags, String).like(f'%"{tag}"%'))
-            
-            if tag_conditions:
-                query = query.filter(or_(*tag_conditions))
+            # Indexed lookup through the post_tags junction (works for SQLite and PostgreSQL)
+            query = query.filter(tagged_with(search_request.tags))
 
         # Apply sorting
         if search_request.sort == "recent":
@@ -114,12 +109,7 @@ class SearchService:
 
             # Apply tag filters
             if search_request.tags:
-                tag_conditions = []
-                for tag in search_request.tags:
-                    tag_conditions.append(cast(BlogPost.tags, String).like(f'%"{tag}"%'))
-                
-                if tag_conditions:
-                    query = query.filter(or_(*tag_conditions))
+                query = query.filter(tagged_with(search_request.tags))
 
             # Calculate relevance scores for each post
             results = query.all()
@@ -445,7 +435,5 @@ class SearchService:
         return self.db.query(BlogPost).filter(BlogPost.section == section).count()
 
     def _count_posts_by_tag(self, tag: str) -> int:
-        """Count posts with a specific tag (SQLite compatible)"""
-        return self.db.query(BlogPost).filter(
-            cast(BlogPost.tags, String).like(f'%"{tag}"%')
-        ).count()
\ No newline at end of file
+        """Count posts with a specific tag"""
+        return self.db.query(BlogPost).filter(tagged_with([tag])).count()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import logging
+import threading
+from collections import Counter
+
+from sqlalchemy import bindparam
+
+from database import SessionLocal
+from models.blog import BlogPost
+
+logger = logging.getLogger(__name__)
+
+# Post views counted by this worker that are not in blog_posts.view_count yet
+_pending = Counter()
+_lock = threading.Lock()
+
+_blog_posts = BlogPost.__table__
+_add_views = _blog_posts.update().where(
+    _blog_posts.c.id == bindparam("post_id")
+).values(view_count=_blog_posts.c.view_count + bindparam("views"))
+
+
+def add_view(post_id: int) -> None:
+    """Count a view for the next flush"""
+    with _lock:
+        _pending[post_id] += 1
+
+
+def flush_view_counts() -> None:
+    """Add the pending views to blog_posts in one executemany UPDATE"""
+    global _pending
+    with _lock:
+        batch, _pending = _pending, Counter()
+    if not batch:
+        return
+
+    db = SessionLocal()
+    try:
+        # In id order, so the flush and the analytics batches lock blog_posts rows in the same order
+        db.execute(_add_views, [{"post_id": post_id, "views": views} for post_id, views in sorted(batch.items())])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        # Keep the counts for the next flush rather than losing them
+        with _lock:
+            _pending.update(batch)
+        logger.error("Failed to flush view counts for %d posts: %s", len(batch), e)
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import create_engine, text, inspect, select
 from core.config import settings
 import os
 import sys
@@ -6,9 +6,10 @@ import sys
 # Ensure we can import from app
 sys.path.append(os.getcwd())
 
-from database import Base, engine
+from database import Base, engine, SessionLocal
 # Import ALL models so Base.metadata knows about them
-from models.blog import NewsletterCampaign, NewsletterTemplate, SystemSetting
+from models.blog import NewsletterCampaign, NewsletterTemplate, SystemSetting, BlogPost, BlogTag, post_tags, refresh_tag_counts, SearchAnalytics
+from services.analytics_service import AnalyticsService
 
 def update_schema():
     print("🔄 Checking database schema...")
@@ -61,6 +62,41 @@ def update_schema():
         else:
             print("   ⚠️ system_settings missing even after create_all?")
 
+        # 4. post_tags junction (backfill from the JSON tags column)
+        existing_links = connection.execute(text("SELECT COUNT(*) FROM post_tags")).scalar()
+        if existing_links == 0:
+            print("   ➕ Backfilling post_tags from blog_posts.tags")
+            tag_ids = dict(connection.execute(select(BlogTag.slug, BlogTag.id)).all())
+            rows = []
+            for post_id, tags in connection.execute(select(BlogPost.id, BlogPost.tags)).all():
+                for slug in set(tags or []):
+                    if slug in tag_ids:
+                        rows.append({"post_id": post_id, "tag_id": tag_ids[slug]})
+            if rows:
+                connection.execute(post_tags.insert(), rows)
+            connection.commit()
+            print(f"   ✅ Linked {len(rows)} post/tag pairs")
+
+        # 5. Tag post counts are maintained on write from here on; start them from the junction
+        refresh_tag_counts(connection)
+        connection.commit()
+        print("   ✅ Tag post counts refreshed")
+
+        # 6. Indexes added to existing tables (create_all only builds them with new tables)
+        for table in (BlogPost.__table__, SearchAnalytics.__table__):
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+        connection.commit()
+        print("   ✅ blog_posts and search_analytics indexes verified")
+
+    # 7. Hourly page view rollups start from the raw events recorded so far
+    db = SessionLocal()
+    try:
+        if AnalyticsService(db).backfill_rollups():
+            print("   ✅ Page view rollups backfilled")
+    finally:
+        db.close()
+
     print("✅ Database schema updated successfully!")
 
 if __name__ == "__main__":